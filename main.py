@@ -1,18 +1,85 @@
 import json
+import os
+import pickle
+import sys
+import tempfile
 from stock_market import StockMarket
 import logging
 from models.common import TradeType
 
-def main():
-    # Read stock data from JSON file
-    with open('./data/stock_data.json', 'r') as f:
-        stock_data = json.load(f)
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library encoder is used without it
+    orjson = None
+
+
+def to_json(data) -> str:
+    """Serializes data as indented JSON, using orjson's C encoder when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+
+STOCK_DATA_PATH = './data/stock_data.jsonl'
+STOCK_CACHE_PATH = './data/.stocks.cache'
+# Part of the cache key; bump whenever the pickled Stock classes change their fields.
+STOCK_CACHE_VERSION = 1
+
+
+def hydrate_market(market: StockMarket, source: str = STOCK_DATA_PATH, cache_path: str = STOCK_CACHE_PATH) -> None:
+    """
+    Hydrates the market from a pickled copy of its stocks, re-parsing the source file only when it changed.
+
+    The cache is keyed by STOCK_CACHE_VERSION and the source file's modification time and size; a
+    missing, stale or unreadable cache is rebuilt from the source. Failing to write the cache is
+    logged and does not affect the hydrated market.
+    """
+    source_stat = os.stat(source)
+    source_key = (STOCK_CACHE_VERSION, source_stat.st_mtime_ns, source_stat.st_size)
+    try:
+        with open(cache_path, 'rb') as f:
+            cache_key, stocks = pickle.load(f)
+    except Exception as e:
+        logging.debug("Ignoring unreadable stock cache %s: %s", cache_path, e)
+    else:
+        if cache_key == source_key:
+            # Unpickled strings are fresh objects, so re-intern them as get_stocks would.
+            for symbol, stock in stocks.items():
+                stock.symbol = sys.intern(stock.symbol)
+                market.stocks[sys.intern(symbol)] = stock
+            logging.info("Loaded %d stocks from cache %s", len(stocks), cache_path)
+            return
+        logging.debug("Stock cache %s is stale, rebuilding it from %s", cache_path, source)
+
+    with open(source, 'r') as f:
+        market.get_stocks(json.loads(line) for line in f if line.strip())
+    write_stock_cache(cache_path, source_key, market.stocks)
+
 
+def write_stock_cache(cache_path: str, cache_key: tuple, stocks: dict) -> None:
+    """Atomically replaces the stock cache, logging instead of raising if it cannot be written."""
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or '.',
+                                        prefix=os.path.basename(cache_path) + '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((cache_key, stocks), f, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning("Could not write stock cache %s: %s", cache_path, e)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def main():
     # Instantiate StockMarket
     market = StockMarket()
 
-    # Hydrate the market with stock data
-    market.get_stocks(stock_data)
+    # Hydrate the market with stock data, from the cache or streaming one JSON Lines record at a time
+    try:
+        hydrate_market(market)
+    except Exception as e:
+        logging.error(f"Error hydrating stocks: {e}")
+        return
 
     # Record some trades
     try:
@@ -25,7 +92,7 @@ def main():
     except Exception as e:
         logging.error(f"Error recording trades: {e}")
 
-    print(f"total trades : {json.dumps(market.get_trade_details(),indent=4)} ")
+    print(f"total trades : {to_json(market.get_trade_details())} ")
     # Calculate and print outputs
     print("Dividend Yield:")
     for symbol, stock in market.stocks.items():
@@ -44,8 +111,7 @@ def main():
             print(f"{symbol}: {str(e)}")
 
     print("\nVolume Weighted Stock Price:")
-    for symbol in market.stocks:
-        vwsp = market.calculate_volume_weighted_stock_price(symbol)
+    for symbol, vwsp in market.calculate_vwsp_all().items():
         print(f"{symbol}: {vwsp:.2f}")
 
     print("\nGBCE All Share Index:")
@@ -1,6 +1,6 @@
-from enum import Enum, auto
+from enum import IntEnum
 
-class StockType(Enum):
+class StockType(IntEnum):
     """
     Enumeration representing the type of stock.
     
@@ -8,12 +8,12 @@ class StockType(Enum):
         COMMON: Represents a common stock.
         PREFERRED: Represents a preferred stock.
     """
-    COMMON = auto()
-    PREFERRED = auto()
+    COMMON = 0
+    PREFERRED = 1
 
 
 
-class TradeType(Enum):
+class TradeType(IntEnum):
     """
     Enum representing the type of trade.
 
@@ -21,5 +21,5 @@ class TradeType(Enum):
         BUY: Represents a buy trade.
         SELL: Represents a sell trade.
     """
-    BUY = auto()
-    SELL = auto()
+    BUY = 0
+    SELL = 1
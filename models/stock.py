@@ -1,8 +1,8 @@
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Stock:
     """
     Represents a stock in the stock market.
@@ -16,6 +16,8 @@ class Stock:
     symbol: str
     last_dividend: Optional[int] = None
     par_value: Optional[int] = None
+    # Dividend per share, precomputed by each subclass in __post_init__ (stocks are not mutated after hydration).
+    _dividend: Optional[float] = field(default=None, init=False, repr=False, compare=False)
 
     def calculate_pe_ratio(self, market_price: float) -> float:
         """
@@ -51,10 +53,13 @@ class Stock:
         """
         raise NotImplementedError("Must be implemented in subclasses")
     
-@dataclass
+@dataclass(slots=True)
 class CommonStock(Stock):
     """Represents a common stock in the stock market."""
 
+    def __post_init__(self):
+        self._dividend = self.last_dividend or 0
+
     def calculate_dividend_yield(self, market_price: float) -> float:
         """
         Calculates the dividend yield for the common stock.
@@ -67,21 +72,13 @@ class CommonStock(Stock):
 
         Raises:
             ValueError: If the market price is less than or equal to zero.
-            Exception: If any unexpected error occurs during the calculation.
 
         """
-        try:
-            if market_price <= 0:
-                raise ValueError("Market price must be greater than zero")
-            return self.last_dividend / market_price if self.last_dividend else 0
-        except ValueError as e:
-            logging.error(f"ValueError in CommonStock.calculate_dividend_yield for {self.symbol}: {e}")
-            raise
-        except Exception as e:
-            logging.error(f"Unexpected error in CommonStock.calculate_dividend_yield for {self.symbol}: {e}")
-            raise
+        if market_price <= 0:
+            raise ValueError("Market price must be greater than zero")
+        return self._dividend / market_price if self._dividend else 0
 
-@dataclass
+@dataclass(slots=True)
 class PreferredStock(Stock):
     """
     Represents a preferred stock.
@@ -92,6 +89,10 @@ class PreferredStock(Stock):
 
     fixed_dividend: Optional[float] = None
 
+    def __post_init__(self):
+        if self.fixed_dividend and self.par_value is not None:
+            self._dividend = self.fixed_dividend * self.par_value
+
     def calculate_dividend_yield(self, market_price: float) -> float:
         """
         Calculates the dividend yield of the preferred stock.
@@ -105,13 +106,6 @@ class PreferredStock(Stock):
         Raises:
             ValueError: If the market price is invalid or the fixed dividend is not set.
         """
-        try:
-            if market_price <= 0 or not self.fixed_dividend:
-                raise ValueError("Invalid market price or fixed dividend")
-            return (self.fixed_dividend * self.par_value) / market_price
-        except ValueError as e:
-            logging.error(f"ValueError in PreferredStock.calculate_dividend_yield for {self.symbol}: {e}")
-            raise
-        except Exception as e:
-            logging.error(f"Unexpected error in PreferredStock.calculate_dividend_yield for {self.symbol}: {e}")
-            raise
\ No newline at end of file
+        if market_price <= 0 or self._dividend is None:
+            raise ValueError("Invalid market price or fixed dividend")
+        return self._dividend / market_price
\ No newline at end of file
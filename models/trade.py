@@ -1,10 +1,11 @@
 from models.stock import Stock
 from dataclasses import dataclass, field
+from typing import Optional
 from models.common import TradeType
 from datetime import datetime, timezone
-import logging
+import time
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """
     Represents a trade in the stock market.
@@ -14,30 +15,44 @@ class Trade:
         quantity (int): The quantity of stocks being traded.
         type (TradeType): The type of trade (buy or sell).
         traded_price (float): The price at which the trade was executed.
-        timestamp (datetime): The timestamp of the trade (default is the current UTC time).
+        timestamp (int): The timestamp of the trade in nanoseconds since the Unix epoch (default is the current time).
+        symbol (str): The symbol of the traded stock, copied from the stock on initialization.
     """
 
     stock: Stock
     quantity: int
     type: TradeType
     traded_price: float
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: int = field(default_factory=time.time_ns)
+    symbol: str = field(init=False)
+    _iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """
-        Performs post-initialization validation for the Trade object.
+        Performs post-initialization validation for the Trade object and copies the stock symbol.
 
         Raises:
+            TypeError: If the quantity is not an integer.
             ValueError: If the quantity or traded_price is less than or equal to zero.
         """
-        try:
-            if self.quantity <= 0:
-                raise ValueError("Trade quantity must be greater than zero")
-            if self.traded_price <= 0:
-                raise ValueError("Traded price must be greater than zero")
-        except ValueError as e:
-            logging.error(f"ValueError in Trade.__post_init__: {e}")
-            raise
-        except Exception as e:
-            logging.error(f"Unexpected error in Trade.__post_init__: {e}")
-            raise
\ No newline at end of file
+        if not isinstance(self.quantity, int) or isinstance(self.quantity, bool):
+            raise TypeError("Trade quantity must be an integer")
+        if self.quantity <= 0:
+            raise ValueError("Trade quantity must be greater than zero")
+        if self.traded_price <= 0:
+            raise ValueError("Traded price must be greater than zero")
+        self.symbol = self.stock.symbol
+
+    def isoformat(self) -> str:
+        """
+        Formats the trade timestamp as an ISO 8601 UTC string.
+
+        The timestamp never changes, so the string is built on the first call and reused afterwards.
+
+        Returns:
+            str: The timestamp with microsecond precision, e.g. 2024-01-01T12:00:00.000000+00:00.
+        """
+        if self._iso is None:
+            seconds, nanoseconds = divmod(self.timestamp, 1_000_000_000)
+            self._iso = datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=nanoseconds // 1000).isoformat()
+        return self._iso
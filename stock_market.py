@@ -1,12 +1,71 @@
 from models.trade import Trade
 from models.stock import Stock, CommonStock, PreferredStock
 from models.common import StockType, TradeType
-from datetime import datetime, timedelta, timezone
+from collections import defaultdict, deque
 from math import log, exp
-from typing import Dict, List, Union
+from time import time_ns
+from typing import Deque, Dict, Iterable, List, Tuple, Union
 import logging
+import sys
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_VWAP_WINDOW_NS = 15 * 60 * 1_000_000_000
+# TradeType values are 0-based, so names can be read by index instead of via Enum.name.
+_TRADE_TYPE_NAMES = tuple(trade_type.name for trade_type in TradeType)
+# Stock constructors keyed by the casefolded stock type name used in hydration data.
+_STOCK_CONSTRUCTORS = {
+    StockType.COMMON.name.casefold(): lambda symbol, data: CommonStock(symbol=symbol,
+                                                                       last_dividend=data['last_dividend'],
+                                                                       par_value=data['par_value']),
+    StockType.PREFERRED.name.casefold(): lambda symbol, data: PreferredStock(symbol=symbol,
+                                                                             last_dividend=data['last_dividend'],
+                                                                             par_value=data['par_value'],
+                                                                             fixed_dividend=data['fixed_dividend']),
+}
+
+
+class _VolumeWindow:
+    """
+    Sliding window of one stock's trades with running price * quantity and quantity totals.
+
+    Entries are (timestamp_ns, price * quantity, quantity) tuples in recording order, so
+    expired trades are always at the head and can be dropped without a scan. This assumes the
+    wall clock behind Trade.timestamp does not step backwards; if it does, an older entry queued
+    behind a newer one stays in the totals until the newer one expires. It is the only place in
+    StockMarket that relies on trades arriving in timestamp order.
+    """
+
+    __slots__ = ('entries', 'total_product', 'total_quantity')
+
+    def __init__(self):
+        self.entries: Deque[Tuple[int, float, int]] = deque()
+        self.total_product = 0.0
+        self.total_quantity = 0
+
+    def push(self, timestamp: int, price: float, quantity: int) -> None:
+        product = price * quantity
+        self.entries.append((timestamp, product, quantity))
+        self.total_product += product
+        self.total_quantity += quantity
+        self.evict(timestamp - _VWAP_WINDOW_NS)
+
+    def evict(self, cutoff: int) -> None:
+        entries = self.entries
+        while entries and entries[0][0] <= cutoff:
+            _, product, quantity = entries.popleft()
+            self.total_product -= product
+            self.total_quantity -= quantity
+        if not entries:
+            # Reset rather than keep subtracting so rounding error cannot accumulate.
+            self.total_product = 0.0
+            self.total_quantity = 0
+
+    def vwsp(self, cutoff: int) -> float:
+        """Evicts trades at or before cutoff and returns the volume weighted price of the rest, or 0."""
+        self.evict(cutoff)
+        return self.total_product / self.total_quantity if self.total_quantity else 0
 
 class StockMarket:
     """
@@ -19,6 +78,7 @@ class StockMarket:
     Methods:
         record_trade: Records a trade in the stock market.
         calculate_volume_weighted_stock_price: Calculates the volume weighted stock price for a given stock symbol.
+        calculate_vwsp_all: Calculates the volume weighted stock price of every stock.
         calculate_gbce_all_share_index: Calculates the GBCE All Share Index.
         hydrate_stocks: Hydrates the stock market with stock data.
         get_trade_details: Retrieves the details of all trades recorded in the stock market.
@@ -27,6 +87,10 @@ class StockMarket:
     def __init__(self):
         self.trades: List[Trade] = []
         self.stocks: Dict[str, Stock] = {}
+        self._vwap_windows: Dict[str, _VolumeWindow] = defaultdict(_VolumeWindow)
+        # Running sums of log(price) * quantity and quantity over all trades for the GBCE index.
+        self._gbce_log_sum = 0.0
+        self._gbce_quantity_sum = 0
 
     def record_trade(self, stock_symbol: str, quantity: int, trade_type: TradeType, price: float) -> None:
         """
@@ -44,18 +108,18 @@ class StockMarket:
         Returns:
             None
         """
-        try:
-            stock = self.stocks.get(stock_symbol)
-            if not stock:
-                raise ValueError(f"Stock {stock_symbol} not found in the market")
-            self.trades.append(Trade(stock=stock, quantity=quantity, type=trade_type, traded_price=price))
-            logging.info(f"Recorded trade for {stock_symbol}: {quantity} @ {price}")
-        except ValueError as e:
-            logging.error(f"ValueError in StockMarket.record_trade: {e}")
-            raise
-        except Exception as e:
-            logging.error(f"Unexpected error in StockMarket.record_trade: {e}")
-            raise
+        stock = self.stocks.get(stock_symbol)
+        if not stock:
+            raise ValueError(f"Stock {stock_symbol} not found in the market")
+        trade = Trade(stock=stock, quantity=quantity, type=trade_type, traded_price=price)
+        # Compute the fallible log weight before touching any state, so a failure leaves it unchanged.
+        log_weight = log(trade.traded_price) * trade.quantity
+        # stock.symbol was interned by get_stocks, so it is reused as the window key.
+        self._vwap_windows[stock.symbol].push(trade.timestamp, trade.traded_price, trade.quantity)
+        self._gbce_log_sum += log_weight
+        self._gbce_quantity_sum += trade.quantity
+        self.trades.append(trade)
+        logger.info("Recorded trade for %s: %s @ %s", stock_symbol, quantity, price)
 
     def calculate_volume_weighted_stock_price(self, stock_symbol: str) -> float:
         """
@@ -68,20 +132,28 @@ class StockMarket:
             float: The volume weighted stock price.
         """
         try:
-            now = datetime.now(timezone.utc)
-            time_15_minutes_ago = now - timedelta(minutes=15)
-            relevant_trades = (trade for trade in self.trades if trade.stock.symbol == stock_symbol and trade.timestamp > time_15_minutes_ago)
-            total_product, total_quantity = 0, 0
-            for trade in relevant_trades:
-                total_product += trade.traded_price * trade.quantity
-                total_quantity += trade.quantity
-            vwsp = total_product / total_quantity if total_quantity else 0
-            logging.info(f"Volume Weighted Stock Price for {stock_symbol}: {vwsp:.2f}")
+            vwsp = 0
+            if (window := self._vwap_windows.get(stock_symbol)) is not None:
+                vwsp = window.vwsp(time_ns() - _VWAP_WINDOW_NS)
+            logger.debug("Volume Weighted Stock Price for %s: %.2f", stock_symbol, vwsp)
             return vwsp
         except Exception as e:
-            logging.error(f"Unexpected error in StockMarket.calculate_volume_weighted_stock_price: {e}")
+            logger.error("Unexpected error in StockMarket.calculate_volume_weighted_stock_price: %s", e)
             return 0
 
+    def calculate_vwsp_all(self) -> Dict[str, float]:
+        """
+        Calculates the volume weighted stock price of every stock from the per-symbol sliding windows.
+
+        Returns:
+            Dict[str, float]: The volume weighted stock price per stock symbol, 0 for stocks without trades in the last 15 minutes.
+        """
+        cutoff = time_ns() - _VWAP_WINDOW_NS
+        vwsp = dict.fromkeys(self.stocks, 0)
+        for symbol, window in self._vwap_windows.items():
+            vwsp[symbol] = window.vwsp(cutoff)
+        return vwsp
+
     def calculate_gbce_all_share_index(self) -> float:
         """
         Calculates the GBCE All Share Index.
@@ -90,23 +162,21 @@ class StockMarket:
             float: The GBCE All Share Index.
         """
         try:
-            if not self.trades:
-                return 0
-            log_sum = sum(log(trade.traded_price) * trade.quantity for trade in self.trades)
-            total_quantity = sum(trade.quantity for trade in self.trades)
-            gbce_index = exp(log_sum / total_quantity) if total_quantity else 0
-            logging.info(f"GBCE All Share Index: {gbce_index:.2f}")
+            total_quantity = self._gbce_quantity_sum
+            gbce_index = exp(self._gbce_log_sum / total_quantity) if total_quantity else 0
+            logger.debug("GBCE All Share Index: %.2f", gbce_index)
             return gbce_index
         except Exception as e:
-            logging.error(f"Unexpected error in StockMarket.calculate_gbce_all_share_index: {e}")
+            logger.error("Unexpected error in StockMarket.calculate_gbce_all_share_index: %s", e)
             return 0
 
-    def get_stocks(self, stock_data: List[Dict[str, Union[str, int, float]]]) -> None:
+    def get_stocks(self, stock_data: Iterable[Dict[str, Union[str, int, float]]]) -> None:
         """
         Get the stock market with stock data.
 
         Args:
-            stock_data (List[Dict[str, Union[str, int, float]]]): A list of dictionaries containing stock data.
+            stock_data (Iterable[Dict[str, Union[str, int, float]]]): Dictionaries containing stock data.
+                Records are consumed one at a time, so a generator can stream them from disk.
 
         Raises:
             ValueError: If the stock type is unknown or missing.
@@ -114,27 +184,15 @@ class StockMarket:
         Returns:
             None
         """
-        try:
-            for data in stock_data:
-                stock_type = StockType[data['type'].upper()] if isinstance(data.get('type'), str) and data['type'].upper() in StockType.__members__ else None
-                if not stock_type:
-                    raise ValueError(f"Unknown or missing stock type {data.get('type')}")
-                if stock_type == StockType.COMMON:
-                    self.stocks[data['symbol']] = CommonStock(symbol=data['symbol'],
-                                                              last_dividend=data['last_dividend'],
-                                                              par_value=data['par_value'])
-                elif stock_type == StockType.PREFERRED:
-                    self.stocks[data['symbol']] = PreferredStock(symbol=data['symbol'],
-                                                                 last_dividend=data['last_dividend'],
-                                                                 par_value=data['par_value'],
-                                                                 fixed_dividend=data['fixed_dividend'])
-                logging.info(f"Hydrated stock: {data['symbol']}")
-        except ValueError as e:
-            logging.error(f"ValueError in StockMarket.hydrate_stocks: {e}")
-            raise
-        except Exception as e:
-            logging.error(f"Unexpected error in StockMarket.hydrate_stocks: {e}")
-            raise
+        for data in stock_data:
+            stock_type = data.get('type')
+            constructor = _STOCK_CONSTRUCTORS.get(stock_type.casefold()) if isinstance(stock_type, str) else None
+            if constructor is None:
+                raise ValueError(f"Unknown or missing stock type {stock_type}")
+            # Interned symbols share one string object (and its cached hash) across every lookup.
+            symbol = sys.intern(data['symbol'])
+            self.stocks[symbol] = constructor(symbol, data)
+            logger.info("Hydrated stock: %s", symbol)
 
     def get_trade_details(self) -> List[Dict[str, Union[str, int, float]]]:
         """
@@ -143,14 +201,13 @@ class StockMarket:
         Returns:
             List[Dict[str, Union[str, int, float]]]: A list of dictionaries containing trade details.
         """
-        trade_list = []
-        for trade in self.trades:
-            trade_details = {
-                'symbol': trade.stock.symbol,
+        return [
+            {
+                'symbol': trade.symbol,
                 'quantity': trade.quantity,
-                'type': trade.type.name,
+                'type': _TRADE_TYPE_NAMES[trade.type],
                 'traded_price': trade.traded_price,
-                'timestamp': trade.timestamp.isoformat()
+                'timestamp': trade.isoformat()
             }
-            trade_list.append(trade_details)
-        return trade_list
\ No newline at end of file
+            for trade in self.trades
+        ]
\ No newline at end of file
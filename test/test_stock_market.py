@@ -1,10 +1,16 @@
+import json
+import os
+import sys
+import tempfile
 import unittest
 from unittest.mock import patch
 from datetime import datetime, timedelta, timezone
+from time import time_ns
 from stock_market import StockMarket
 from models.stock import CommonStock, PreferredStock
 from models.trade import Trade
 from models.common import TradeType
+from main import hydrate_market
 
 class TestStockMarket(unittest.TestCase):
 
@@ -35,6 +41,7 @@ class TestStockMarket(unittest.TestCase):
         common_stock = CommonStock(symbol="ABC", last_dividend=8, par_value=100)
         trade = Trade(stock=common_stock, quantity=100, type=TradeType.BUY, traded_price=100)
         self.assertEqual(trade.stock.symbol, "ABC")
+        self.assertEqual(trade.symbol, "ABC")
         self.assertEqual(trade.quantity, 100)
         self.assertEqual(trade.type, TradeType.BUY)
         self.assertEqual(trade.traded_price, 100)
@@ -43,13 +50,21 @@ class TestStockMarket(unittest.TestCase):
         with self.assertRaises(ValueError):
             Trade(stock=common_stock, quantity=-100, type=TradeType.SELL, traded_price=100)
 
+    def test_trade_isoformat(self):
+        # Test formatting the nanosecond trade timestamp as an ISO 8601 UTC string
+        common_stock = CommonStock(symbol="ABC", last_dividend=8, par_value=100)
+        executed_at = datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+        timestamp = (executed_at - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1) * 1000 + 234
+        trade = Trade(stock=common_stock, quantity=100, type=TradeType.BUY, traded_price=100, timestamp=timestamp)
+        self.assertEqual(trade.isoformat(), executed_at.isoformat())
+
     def test_hydrate_stocks(self):
         # Test hydrating stocks with valid and invalid data
         stock_data = [
             {"symbol": "ABC", "type": "common", "last_dividend": 8, "par_value": 100},
             {"symbol": "XYZ", "type": "preferred", "last_dividend": 8, "fixed_dividend": 0.02, "par_value": 100}
         ]
-        self.market.hydrate_stocks(stock_data)
+        self.market.get_stocks(stock_data)
         self.assertEqual(len(self.market.stocks), 2)
 
         # Test handling of invalid stock data
@@ -57,7 +72,28 @@ class TestStockMarket(unittest.TestCase):
             {"symbol": "DEF", "type": "unknown", "last_dividend": 10, "par_value": 50}
         ]
         with self.assertRaises(ValueError):
-            self.market.hydrate_stocks(invalid_stock_data)
+            self.market.get_stocks(invalid_stock_data)
+
+    def test_get_stocks_dispatch(self):
+        # Test hydrating from a generator with mixed-case stock types
+        stock_data = [
+            {"symbol": "".join(["A", "BC"]), "type": "Common", "last_dividend": 8, "par_value": 100},
+            {"symbol": "".join(["X", "YZ"]), "type": "PREFERRED", "last_dividend": 8, "fixed_dividend": 0.02, "par_value": 100}
+        ]
+        self.market.get_stocks(data for data in stock_data)
+        self.assertIsInstance(self.market.stocks["ABC"], CommonStock)
+        self.assertIsInstance(self.market.stocks["XYZ"], PreferredStock)
+        self.assertAlmostEqual(self.market.stocks["XYZ"].calculate_dividend_yield(100), 0.02)
+
+        # Test that symbols are interned in both the keys and the stocks
+        for symbol, stock in self.market.stocks.items():
+            self.assertIs(symbol, sys.intern(symbol))
+            self.assertIs(stock.symbol, symbol)
+
+        # Test handling of unknown, missing and non-string stock types
+        for invalid_type in ({"type": "ordinary"}, {}, {"type": 1}):
+            with self.assertRaises(ValueError):
+                self.market.get_stocks([{"symbol": "DEF", "last_dividend": 10, "par_value": 50, **invalid_type}])
 
     def test_record_trade(self):
         # Test recording trades
@@ -69,6 +105,21 @@ class TestStockMarket(unittest.TestCase):
         # Test handling of invalid stock symbol
         with self.assertRaises(ValueError):
             self.market.record_trade(stock_symbol="DEF", quantity=100, trade_type=TradeType.BUY, price=100)
+        with self.assertRaises(ValueError):
+            self.market.record_trade(stock_symbol=None, quantity=100, trade_type=TradeType.BUY, price=100)
+
+    def test_record_trade_rejected_leaves_state_unchanged(self):
+        # Test that rejected trades leave the trade log and the analytics untouched
+        self.market.stocks["ABC"] = CommonStock(symbol="ABC", last_dividend=8, par_value=100)
+        self.market.stocks["XYZ"] = CommonStock(symbol="XYZ", last_dividend=8, par_value=100)
+        with self.assertRaises(TypeError):
+            self.market.record_trade(stock_symbol="ABC", quantity=1.5, trade_type=TradeType.BUY, price=999)
+        with self.assertRaises(TypeError):
+            self.market.record_trade(stock_symbol="ABC", quantity=10, trade_type=TradeType.BUY, price="999")
+        self.market.record_trade(stock_symbol="XYZ", quantity=10, trade_type=TradeType.BUY, price=50)
+        self.assertEqual(len(self.market.trades), 1)
+        self.assertEqual(self.market.calculate_vwsp_all(), {"ABC": 0, "XYZ": 50})
+        self.assertAlmostEqual(self.market.calculate_gbce_all_share_index(), 50)
 
     def test_calculate_volume_weighted_stock_price(self):
         # Test calculating volume weighted stock price
@@ -78,6 +129,39 @@ class TestStockMarket(unittest.TestCase):
         self.market.record_trade(stock_symbol="ABC", quantity=100, trade_type=TradeType.SELL, price=105)
         self.assertAlmostEqual(self.market.calculate_volume_weighted_stock_price("ABC"), 102.5)
 
+    def test_volume_weighted_stock_price_excludes_expired_trades(self):
+        # Test that trades older than 15 minutes drop out of the volume weighted stock price
+        common_stock = CommonStock(symbol="ABC", last_dividend=8, par_value=100)
+        self.market.stocks["ABC"] = common_stock
+        self.market.record_trade(stock_symbol="ABC", quantity=100, trade_type=TradeType.BUY, price=100)
+        sixteen_minutes_later = time_ns() + 16 * 60 * 1_000_000_000
+        with patch('stock_market.time_ns', return_value=sixteen_minutes_later):
+            self.assertAlmostEqual(self.market.calculate_volume_weighted_stock_price("ABC"), 0)
+        self.market.record_trade(stock_symbol="ABC", quantity=50, trade_type=TradeType.SELL, price=110)
+        self.assertAlmostEqual(self.market.calculate_volume_weighted_stock_price("ABC"), 110)
+
+    def test_calculate_vwsp_all(self):
+        # Test calculating the volume weighted stock price of every stock at once
+        self.market.stocks["ABC"] = CommonStock(symbol="ABC", last_dividend=8, par_value=100)
+        self.market.stocks["XYZ"] = PreferredStock(symbol="XYZ", last_dividend=8, par_value=100, fixed_dividend=0.02)
+        self.market.stocks["DEF"] = CommonStock(symbol="DEF", last_dividend=0, par_value=100)
+        self.market.record_trade(stock_symbol="ABC", quantity=100, trade_type=TradeType.BUY, price=100)
+        self.market.record_trade(stock_symbol="XYZ", quantity=50, trade_type=TradeType.BUY, price=90)
+        self.market.record_trade(stock_symbol="ABC", quantity=100, trade_type=TradeType.SELL, price=105)
+        vwsp = self.market.calculate_vwsp_all()
+        self.assertEqual(set(vwsp), {"ABC", "XYZ", "DEF"})
+        self.assertAlmostEqual(vwsp["ABC"], 102.5)
+        self.assertAlmostEqual(vwsp["XYZ"], 90)
+        self.assertAlmostEqual(vwsp["DEF"], 0)
+
+        # Test that it agrees with the per-symbol calculation
+        for symbol, price in vwsp.items():
+            self.assertAlmostEqual(price, self.market.calculate_volume_weighted_stock_price(symbol))
+
+        # Test that trades outside the 15 minute window are excluded
+        with patch('stock_market.time_ns', return_value=time_ns() + 16 * 60 * 1_000_000_000):
+            self.assertEqual(self.market.calculate_vwsp_all(), {"ABC": 0, "XYZ": 0, "DEF": 0})
+
     def test_calculate_gbce_all_share_index(self):
         # Test calculating GBCE All Share Index
         common_stock = CommonStock(symbol="ABC", last_dividend=8, par_value=100)
@@ -133,14 +217,83 @@ class TestStockMarket(unittest.TestCase):
         with patch('logging.error') as mock_logging:
             with self.assertRaises(ValueError):
                 Trade(stock=CommonStock(symbol="ABC", last_dividend=8, par_value=100), quantity=100, type=TradeType.BUY, traded_price=0)
-            mock_logging.assert_called_once()
+            mock_logging.assert_not_called()
 
     def test_trade_post_init_negative_traded_price(self):
         # Test Trade __post_init__ with negative traded price
         with patch('logging.error') as mock_logging:
             with self.assertRaises(ValueError):
                 Trade(stock=CommonStock(symbol="ABC", last_dividend=8, par_value=100), quantity=100, type=TradeType.BUY, traded_price=-100)
+            mock_logging.assert_not_called()
+
+
+
+class TestHydrateMarket(unittest.TestCase):
+
+    def setUp(self):
+        # Write the source file into a temporary directory for each test
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.source = os.path.join(self.tmp_dir.name, "stock_data.jsonl")
+        self.cache_path = os.path.join(self.tmp_dir.name, ".stocks.cache")
+        self.write_source([
+            {"symbol": "ABC", "type": "common", "last_dividend": 8, "par_value": 100},
+            {"symbol": "XYZ", "type": "preferred", "last_dividend": 8, "fixed_dividend": 0.02, "par_value": 100}
+        ])
+
+    def write_source(self, stock_data):
+        with open(self.source, "w") as f:
+            f.writelines(json.dumps(data) + "\n" for data in stock_data)
+
+    def hydrate(self):
+        market = StockMarket()
+        hydrate_market(market, source=self.source, cache_path=self.cache_path)
+        return market
+
+    def test_cache_hit(self):
+        # Test that a second hydration loads the cache without parsing the source
+        first = self.hydrate()
+        self.assertTrue(os.path.exists(self.cache_path))
+        with patch.object(StockMarket, "get_stocks") as mock_get_stocks, patch("logging.info") as mock_logging:
+            second = self.hydrate()
+            mock_get_stocks.assert_not_called()
+            mock_logging.assert_called_once_with("Loaded %d stocks from cache %s", 2, self.cache_path)
+        self.assertEqual(second.stocks, first.stocks)
+        self.assertAlmostEqual(second.stocks["XYZ"].calculate_dividend_yield(100), 0.02)
+        for symbol, stock in second.stocks.items():
+            self.assertIs(symbol, sys.intern(symbol))
+            self.assertIs(stock.symbol, symbol)
+
+    def test_stale_cache(self):
+        # Test that changing the source invalidates the cache
+        self.hydrate()
+        self.write_source([{"symbol": "DEF", "type": "common", "last_dividend": 10, "par_value": 50}])
+        self.assertEqual(set(self.hydrate().stocks), {"DEF"})
+
+        # Test that a cache written by another cache version is rebuilt
+        with patch("main.STOCK_CACHE_VERSION", -1):
+            self.hydrate()
+        with patch.object(StockMarket, "get_stocks", autospec=True) as mock_get_stocks:
+            self.hydrate()
+            mock_get_stocks.assert_called_once()
+
+    def test_corrupt_cache(self):
+        # Test that an unreadable cache is rebuilt from the source
+        with open(self.cache_path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertEqual(set(self.hydrate().stocks), {"ABC", "XYZ"})
+        with patch.object(StockMarket, "get_stocks") as mock_get_stocks:
+            self.assertEqual(set(self.hydrate().stocks), {"ABC", "XYZ"})
+            mock_get_stocks.assert_not_called()
+
+    def test_unwritable_cache_path(self):
+        # Test that failing to write the cache is logged and the market is still hydrated
+        self.cache_path = os.path.join(self.tmp_dir.name, "missing", ".stocks.cache")
+        with patch("logging.warning") as mock_logging:
+            market = self.hydrate()
             mock_logging.assert_called_once()
+        self.assertEqual(set(market.stocks), {"ABC", "XYZ"})
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["stock_data.jsonl"])
 
 
 if __name__ == "__main__":